@@ -62,6 +62,11 @@ class Settings:
         os.getenv("LIGHTCURVE_MODEL_PATH", "models/lightcurve/model.keras")
     )
     LC_MODEL_THRESHOLD: float = _env_float("LC_MODEL_THRESHOLD", 0.5)
+    # float32 (the .keras model as-is) | float16 | int8_dynamic | int8 (TFLite, see
+    # scripts/quantize_lightcurve_model.py). Empty LC_QUANT_MODEL_PATH -> <model>.<precision>.tflite
+    LC_MODEL_PRECISION: str = os.getenv("LC_MODEL_PRECISION", "float32").strip().lower()
+    LC_QUANT_MODEL_PATH: str = os.getenv("LC_QUANT_MODEL_PATH", "")
+    LC_TFLITE_THREADS: int = _env_int("LC_TFLITE_THREADS", 0)  # 0 -> TFLite default
 
     # --- Server (optional; only if you read these elsewhere) ---
     UVICORN_HOST: str = os.getenv("UVICORN_HOST", "0.0.0.0")
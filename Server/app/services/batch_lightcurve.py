@@ -0,0 +1,286 @@
+# app/services/batch_lightcurve.py
+import csv
+import importlib.util
+import io
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from PIL import Image  # pillow>=10
+
+from app.services.predictor_lightcurve import (
+    _extract_series_from_plot,
+    _infer_seq_len_from_model,
+    predict_lightcurve_batch,
+)
+
+# ----------------------------
+# Offline batch scoring of light-curve plot images
+# ----------------------------
+# Pipeline: source walker -> process pool (decode + series extraction, CPU-bound)
+# -> bounded in-flight window -> one batched model.predict per `batch_size` curves
+# -> incremental CSV/Parquet sink. The model never leaves the parent process.
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp"}
+RESULT_FIELDS = ["path", "probability", "label", "error"]
+
+# (key, file path or None, raw bytes or None) -- exactly one of path/bytes is set
+ImageJob = Tuple[str, Optional[str], Optional[bytes]]
+
+
+def _is_image(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTS
+
+
+def image_source_kind(src: str) -> str:
+    """Return "dir", "zip" or "tar" for a scorable source; ValueError for anything else."""
+    if not os.path.exists(src):
+        raise ValueError(f"Input not found: {src}")
+    if os.path.isdir(src):
+        return "dir"
+    if zipfile.is_zipfile(src):
+        return "zip"
+    if tarfile.is_tarfile(src):
+        return "tar"
+    raise ValueError(f"Not a directory, zip or tar archive: {src}")
+
+
+def iter_image_sources(src: str) -> Iterator[ImageJob]:
+    """
+    Yield image jobs from a directory (recursive), a .zip, or a tar archive (.tar, .tar.gz, ...).
+    Keys are POSIX paths relative to `src`; archive members are read lazily, one at a time.
+    """
+    kind = image_source_kind(src)
+    if kind == "dir":
+        for root, dirs, files in os.walk(src):
+            dirs.sort()
+            for name in sorted(files):
+                if _is_image(name):
+                    path = os.path.join(root, name)
+                    key = os.path.relpath(path, src).replace(os.sep, "/")
+                    yield key, path, None
+    elif kind == "zip":
+        with zipfile.ZipFile(src) as zf:
+            for info in sorted(zf.infolist(), key=lambda i: i.filename):
+                if not info.is_dir() and _is_image(info.filename):
+                    yield info.filename, None, zf.read(info)
+    else:
+        with tarfile.open(src) as tf:
+            for member in tf:  # stream order; avoids re-seeking compressed tars
+                if member.isfile() and _is_image(member.name):
+                    f = tf.extractfile(member)
+                    if f is not None:
+                        yield member.name, None, f.read()
+
+
+def _extract_job(job: ImageJob, target_len: int) -> Tuple[str, Optional[np.ndarray], Optional[str]]:
+    """Worker: decode one image and trace its 1-D series. Errors are returned, not raised."""
+    key, path, data = job
+    try:
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        img = Image.open(io.BytesIO(data))
+        return key, _extract_series_from_plot(img, target_len), None
+    except Exception as e:
+        return key, None, f"{type(e).__name__}: {e}"
+
+
+# ----------------------------
+# Result sinks (append-only, resumable)
+# ----------------------------
+
+class _CsvSink:
+    """
+    Append-only CSV. On resume only successfully scored rows count as done, so failed
+    images are retried; a retried path gets a new row and its last row is authoritative.
+    """
+
+    def __init__(self, path: str, resume: bool):
+        self.path = path
+        self.done: Set[str] = set()
+        # a missing, empty or header-less file (e.g. killed before the first flush) starts over
+        append = resume and self._has_header(path)
+        if append:
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                # a truncated last line has no label, so it is retried too
+                self.done = {row["path"] for row in csv.DictReader(f) if row.get("label") and not row.get("error")}
+        self._f = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self._w = csv.DictWriter(self._f, fieldnames=RESULT_FIELDS)
+        if not append:
+            self._w.writeheader()
+            self._f.flush()
+
+    @staticmethod
+    def _has_header(path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None) == RESULT_FIELDS
+
+    def write(self, rows: List[Dict[str, object]]) -> None:
+        self._w.writerows(rows)
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class _ParquetSink:
+    """
+    Parquet output is a directory of part files, one per flush (readable by pandas.read_parquet).
+    Resume semantics match _CsvSink: rows with an error are retried. Pending rows are flushed
+    once `flush_rows` accumulate or `flush_seconds` pass, bounding what a crash can lose.
+    """
+
+    def __init__(self, path: str, resume: bool, flush_rows: int = 32, flush_seconds: float = 10.0):
+        import pandas as pd  # lazy import
+
+        self._pd = pd
+        self.path = path
+        self.flush_rows = max(1, flush_rows)
+        self.flush_seconds = flush_seconds
+        self.done: Set[str] = set()
+        self._pending: List[Dict[str, object]] = []
+        self._last_flush = time.monotonic()
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(p for p in os.listdir(path) if p.startswith("part-") and p.endswith(".parquet"))
+        if resume:
+            for p in parts:
+                df = pd.read_parquet(os.path.join(path, p), columns=["path", "error"])
+                self.done.update(df.loc[df["error"].isna(), "path"])
+        else:
+            for p in parts:
+                os.remove(os.path.join(path, p))
+            parts = []
+        # numbering may have gaps (parts deleted by hand); never reuse an existing index
+        self._next_part = max((self._part_index(p) for p in parts), default=-1) + 1
+
+    @staticmethod
+    def _part_index(name: str) -> int:
+        try:
+            return int(name[len("part-"):-len(".parquet")])
+        except ValueError:
+            return -1
+
+    def write(self, rows: List[Dict[str, object]]) -> None:
+        self._pending.extend(rows)
+        if (len(self._pending) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self._flush()
+
+    def _flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        df = self._pd.DataFrame(self._pending, columns=RESULT_FIELDS)
+        df["probability"] = df["probability"].astype("float64")
+        df["label"] = df["label"].astype("Int8")
+        df["error"] = df["error"].astype("string")
+        final = os.path.join(self.path, f"part-{self._next_part:05d}.parquet")
+        tmp = final + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, final)  # a part is either complete or absent
+        self._next_part += 1
+        self._pending = []
+
+    def close(self) -> None:
+        self._flush()
+
+
+def open_sink(path: str, resume: bool, flush_rows: int = 32):
+    """
+    CSV for *.csv (flushed on every write), otherwise Parquet (a directory of part files,
+    one per `flush_rows` rows; needs pyarrow or fastparquet).
+    """
+    if path.lower().endswith(".csv"):
+        return _CsvSink(path, resume)
+    if not any(importlib.util.find_spec(m) for m in ("pyarrow", "fastparquet")):
+        raise RuntimeError(
+            f"Parquet output ({path}) needs pyarrow: pip install pyarrow, or use a .csv output path."
+        )
+    return _ParquetSink(path, resume, flush_rows)
+
+
+# ----------------------------
+# Public API: score a directory / archive
+# ----------------------------
+
+def score_images(
+    model,
+    src: str,
+    out_path: str,
+    workers: Optional[int] = None,
+    batch_size: int = 32,
+    resume: bool = False,
+    threshold: Optional[float] = None,
+    max_inflight: Optional[int] = None,
+    flush_rows: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Score every plot image under `src` with a sequence light-curve model and append results
+    to `out_path`. With resume=True, keys already scored successfully are skipped; failed
+    ones are retried. Parquet parts are written every `flush_rows` rows (default: one per
+    inference batch).
+    Returns counts: {"scored", "failed", "skipped"}.
+    """
+    L = _infer_seq_len_from_model(model)
+    if L is None:
+        raise ValueError("Batch scoring needs a sequence model with input (None, L) or (None, L, C).")
+    workers = max(1, workers or os.cpu_count() or 1)
+    batch_size = max(1, batch_size)
+    max_inflight = max_inflight or workers * 4
+
+    image_source_kind(src)  # reject a bad source before open_sink truncates existing output
+    sink = open_sink(out_path, resume, flush_rows or batch_size)
+    counts = {"scored": 0, "failed": 0, "skipped": 0}
+    keys: List[str] = []
+    series: List[np.ndarray] = []
+
+    def run_batch() -> None:
+        rows = [
+            {"path": k, "probability": p, "label": lbl, "error": None}
+            for k, (p, lbl) in zip(keys, predict_lightcurve_batch(model, series, threshold))
+        ]
+        sink.write(rows)
+        counts["scored"] += len(rows)
+        keys.clear()
+        series.clear()
+
+    def collect(done) -> None:
+        for fut in done:
+            key, s, err = fut.result()
+            if err is not None:
+                sink.write([{"path": key, "probability": None, "label": None, "error": err}])
+                counts["failed"] += 1
+                continue
+            keys.append(key)
+            series.append(s)
+            if len(keys) >= batch_size:
+                run_batch()
+
+    # spawn keeps TensorFlow state out of the workers; they only import numpy/PIL
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        try:
+            inflight = set()
+            for job in iter_image_sources(src):
+                if job[0] in sink.done:
+                    counts["skipped"] += 1
+                    continue
+                inflight.add(pool.submit(_extract_job, job, L))
+                if len(inflight) >= max_inflight:  # bounded: wait before reading more input
+                    done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                    collect(done)
+            while inflight:
+                done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                collect(done)
+            if keys:
+                run_batch()
+        finally:
+            sink.close()
+    return counts
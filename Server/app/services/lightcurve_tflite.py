@@ -0,0 +1,83 @@
+# app/services/lightcurve_tflite.py
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+# ----------------------------
+# Reduced-precision (TFLite) light-curve models: serving runtime
+# ----------------------------
+# float16      : weights stored as fp16 (half the file size; CPU kernels still compute in fp32)
+# int8_dynamic : int8 weights, activations quantized on the fly
+# int8         : full-integer post-training quantization, calibrated on a representative dataset
+# Conversion and parity reporting live in app/services/quantize_lightcurve.py (offline only).
+
+PRECISIONS = ("float32", "float16", "int8_dynamic", "int8")
+QUANT_PRECISIONS = PRECISIONS[1:]
+
+
+def quantized_model_path(keras_path: str, precision: str) -> str:
+    """models/lightcurve/model.keras -> models/lightcurve/model.<precision>.tflite"""
+    return f"{os.path.splitext(keras_path)[0]}.{precision}.tflite"
+
+
+class _InputSpec:
+    def __init__(self, shape):
+        self.shape = shape
+
+
+class TFLiteLightcurveModel:
+    """
+    Keras-like facade over a TFLite interpreter: exposes `inputs[0].shape` and
+    `predict(x, verbose=0)` so the predictor_lightcurve helpers work unchanged.
+    """
+
+    def __init__(self, model_content: bytes, num_threads: Optional[int] = None):
+        try:  # standalone LiteRT runtime if installed; tf.lite.Interpreter is deprecated in TF >= 2.20
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf  # lazy import
+            Interpreter = tf.lite.Interpreter
+
+        self._interp = Interpreter(model_content=model_content, num_threads=num_threads or None)
+        self._interp.allocate_tensors()
+        self._lock = threading.Lock()  # interpreters are not thread-safe
+        inp = self._interp.get_input_details()[0]
+        self._in_idx = inp["index"]
+        self._out_idx = self._interp.get_output_details()[0]["index"]
+        sig = inp.get("shape_signature", inp["shape"])
+        self.inputs = [_InputSpec(tuple(None if i == 0 or d < 0 else int(d) for i, d in enumerate(sig)))]
+        self._batch = int(inp["shape"][0])
+        self.size_bytes = len(model_content)
+
+    @classmethod
+    def from_file(cls, path: str, num_threads: Optional[int] = None) -> "TFLiteLightcurveModel":
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Quantized light-curve model not found: {path} "
+                f"(generate it with scripts/quantize_lightcurve_model.py)"
+            )
+        with open(path, "rb") as f:
+            return cls(f.read(), num_threads)
+
+    def predict(self, x: np.ndarray, verbose: int = 0, batch_size: Optional[int] = None) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        with self._lock:
+            if x.shape[0] != self._batch:
+                self._interp.resize_tensor_input(self._in_idx, list(x.shape))
+                self._interp.allocate_tensors()
+                self._batch = x.shape[0]
+            inp = self._interp.get_input_details()[0]
+            scale, zero = inp["quantization"]
+            if inp["dtype"] != np.float32 and scale:  # integer-only input
+                info = np.iinfo(inp["dtype"])
+                x = np.clip(np.round(x / scale + zero), info.min, info.max).astype(inp["dtype"])
+            self._interp.set_tensor(self._in_idx, x)
+            self._interp.invoke()
+            out = self._interp.get_output_details()[0]
+            y = self._interp.get_tensor(self._out_idx)
+        scale, zero = out["quantization"]
+        if out["dtype"] != np.float32 and scale:
+            return (y.astype(np.float32) - zero) * scale
+        return np.array(y, dtype=np.float32)
@@ -7,6 +7,7 @@ import numpy as np
 import joblib  # Use joblib for loading scikit-learn models
 
 from app.core.config import settings
+from app.services.lightcurve_tflite import QUANT_PRECISIONS, TFLiteLightcurveModel, quantized_model_path
 
 # -----------------------------
 # Thread-safe, lazy-loaded singletons (Tabular)
@@ -110,8 +111,17 @@ def _load_keras_model(path: str) -> Any:
     return tf.keras.models.load_model(path)
 
 
+def _load_tflite_model(path: str) -> Any:
+    """Load a reduced-precision TFLite light-curve model behind a Keras-like facade."""
+    return TFLiteLightcurveModel.from_file(path, num_threads=settings.LC_TFLITE_THREADS or None)
+
+
 def get_lightcurve_model() -> Any:
-    """Thread-safe singleton getter for the LIGHT-CURVE Keras model."""
+    """
+    Thread-safe singleton getter for the LIGHT-CURVE model.
+    LC_MODEL_PRECISION=float32 loads the .keras file; float16/int8_dynamic/int8 load the
+    pre-converted TFLite model (LC_QUANT_MODEL_PATH or <model>.<precision>.tflite).
+    """
     global _lc_model_obj
     if _lc_model_obj is None:
         with _lc_model_lock:
@@ -119,8 +129,19 @@ def get_lightcurve_model() -> Any:
                 lc_path = getattr(settings, "LIGHTCURVE_MODEL_PATH", None)
                 if not lc_path:
                     raise RuntimeError("LIGHTCURVE_MODEL_PATH is not set in settings/.env.")
-                print(f"🔍 Loading light-curve model from: {lc_path}")
-                _lc_model_obj = _load_keras_model(lc_path)
+                precision = settings.LC_MODEL_PRECISION
+                if precision == "float32":
+                    print(f"🔍 Loading light-curve model from: {lc_path}")
+                    _lc_model_obj = _load_keras_model(lc_path)
+                elif precision in QUANT_PRECISIONS:
+                    q_path = settings.LC_QUANT_MODEL_PATH or quantized_model_path(lc_path, precision)
+                    print(f"🔍 Loading {precision} light-curve model from: {q_path}")
+                    _lc_model_obj = _load_tflite_model(os.path.normpath(q_path))
+                else:
+                    raise RuntimeError(
+                        f"Unsupported LC_MODEL_PRECISION={precision!r} "
+                        f"(expected float32 or one of {', '.join(QUANT_PRECISIONS)})."
+                    )
                 print("✅ Light-curve model loaded successfully!")
     return _lc_model_obj
 
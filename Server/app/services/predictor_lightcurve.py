@@ -1,49 +1,143 @@
 # app/services/predictor_lightcurve.py
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 import os
 import io
+import threading
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from PIL import Image  # pillow>=10
 
+# ----------------------------
+# Per-worker scratch buffers + shape-keyed lookup tables
+# ----------------------------
+# Each worker thread keeps its own grow-only flat buffers, so steady-state requests
+# reuse the same memory instead of allocating fresh temporaries on every call.
+# Buffers above _SCRATCH_MAX_BYTES (e.g. the (H, W) planes of a very tall plot) are
+# allocated fresh and never pooled, so one odd upload can't pin memory per thread.
+
+_scratch = threading.local()
+
+_SCRATCH_MAX_BYTES = 4 << 20  # 4 MiB per pooled buffer
+
+# rows per block in the rolling median (bounds the (rows, win) scratch matrix)
+_MEDIAN_BLOCK_ROWS = 4096
+
+
+def _scratch_buffer(name: str, shape, dtype=np.float32) -> np.ndarray:
+    """Return a reusable per-thread buffer of `shape`; contents are undefined."""
+    pool = getattr(_scratch, "pool", None)
+    if pool is None:
+        pool = _scratch.pool = {}
+    shape = (shape,) if isinstance(shape, int) else tuple(shape)
+    dtype = np.dtype(dtype)
+    size = int(np.prod(shape, dtype=np.int64))
+    if size * dtype.itemsize > _SCRATCH_MAX_BYTES:
+        return np.empty(shape, dtype=dtype)  # oversized: freed with the request
+    buf = pool.get(name)
+    if buf is None or buf.dtype != dtype or buf.size < size:
+        buf = pool[name] = np.empty(size, dtype=dtype)
+    return buf[:size].reshape(shape)
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr.setflags(write=False)
+    return arr
+
+
+@lru_cache(maxsize=64)
+def _resample_table(n: int, target_len: int,
+                    dtype=np.float64) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(lo, hi, frac) so that out = a[lo] + (a[hi] - a[lo]) * frac matches np.interp."""
+    x_old = np.linspace(0.0, 1.0, n)
+    x_new = np.linspace(0.0, 1.0, target_len)
+    if n == 1:
+        lo = np.zeros(target_len, dtype=np.intp)
+        return _readonly(lo), _readonly(lo.copy()), _readonly(np.zeros(target_len, dtype=dtype))
+    lo = np.clip(np.searchsorted(x_old, x_new, side="right") - 1, 0, n - 2)
+    hi = lo + 1
+    frac = ((x_new - x_old[lo]) / (x_old[hi] - x_old[lo])).astype(dtype)
+    return _readonly(lo), _readonly(hi), _readonly(frac)
+
+
+@lru_cache(maxsize=16)
+def _row_index(h: int) -> np.ndarray:
+    return _readonly(np.arange(h, dtype=np.float32))
+
+
 # ----------------------------
 # Vector-path helpers (your originals)
 # ----------------------------
 
 def _nan_safe(arr: np.ndarray) -> np.ndarray:
-    if not np.isnan(arr).any():
+    # sum() propagates NaN without allocating a boolean mask. It can give false positives
+    # (NaN with no NaN present: +inf and -inf both in arr, or float32 partial sums
+    # overflowing in both directions); those only take the slower interp path below,
+    # which leaves non-NaN values unchanged.
+    with np.errstate(invalid="ignore", over="ignore"):
+        total = arr.sum()
+    if not np.isnan(total):
         return arr
     idx = np.where(~np.isnan(arr))[0]
     if idx.size == 0:
         return np.zeros_like(arr)
-    return np.interp(np.arange(arr.size), idx, arr[idx])
+    # np.interp returns float64; keep arr's dtype so the dtype-keyed scratch buffers
+    # downstream are reused instead of reallocated for NaN-bearing curves
+    return np.interp(np.arange(arr.size), idx, arr[idx]).astype(arr.dtype, copy=False)
 
-def _rolling_median(arr: np.ndarray, win: int) -> np.ndarray:
+def _rolling_median(arr: np.ndarray, win: int, out: Optional[np.ndarray] = None) -> np.ndarray:
     win = max(5, int(win // 2 * 2 + 1))
     pad = win // 2
-    x = np.pad(arr, (pad, pad), mode="edge")
-    out = np.empty_like(arr)
-    for i in range(arr.size):
-        out[i] = np.median(x[i:i + win])
+    n = arr.size
+    if out is None:
+        out = np.empty_like(arr)
+    x = _scratch_buffer("rm_pad", n + 2 * pad, arr.dtype)
+    x[pad:pad + n] = arr
+    x[:pad] = arr[0]
+    x[pad + n:] = arr[-1]
+    windows = sliding_window_view(x, win)  # (n, win) view, no copy
+    # win is odd, so the median is the middle order statistic; partition in place
+    for start in range(0, n, _MEDIAN_BLOCK_ROWS):
+        stop = min(start + _MEDIAN_BLOCK_ROWS, n)
+        block = _scratch_buffer("rm_block", (stop - start, win), arr.dtype)
+        np.copyto(block, windows[start:stop])
+        block.partition(pad, axis=1)
+        np.copyto(out[start:stop], block[:, pad])
     return out
 
-def _median_detrend(arr: np.ndarray, win: Optional[int] = None) -> np.ndarray:
+def _median_detrend(arr: np.ndarray, win: Optional[int] = None,
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
     if win is None:
         win = int(max(11, min(101, arr.size // 30)))
         win = win // 2 * 2 + 1
-    baseline = _rolling_median(arr, win)
-    return arr - baseline
+    baseline = _rolling_median(arr, win, out=_scratch_buffer("baseline", arr.size, arr.dtype))
+    return np.subtract(arr, baseline, out=out)
 
-def _standardize(arr: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+def _standardize(arr: np.ndarray, eps: float = 1e-8, out: Optional[np.ndarray] = None) -> np.ndarray:
     mu = float(np.mean(arr))
-    sd = float(np.std(arr))
-    return (arr - mu) / (sd + eps)
+    out = np.subtract(arr, mu, out=out)
+    # std via the centred values already in `out` (avoids np.std's temporary)
+    sd = float(np.sqrt(np.dot(out, out) / max(out.size, 1)))
+    out /= (sd + eps)
+    return out
 
-def _resample_lin(arr: np.ndarray, target_len: int) -> np.ndarray:
+def _resample_lin(arr: np.ndarray, target_len: int, out: Optional[np.ndarray] = None) -> np.ndarray:
     if arr.size == target_len:
-        return arr
-    x_old = np.linspace(0.0, 1.0, arr.size)
-    x_new = np.linspace(0.0, 1.0, target_len)
-    return np.interp(x_new, x_old, arr)
+        if out is None:
+            return arr
+        np.copyto(out, arr)
+        return out
+    if out is None:
+        out = np.empty(target_len, dtype=np.float64)
+    lo, hi, frac = _resample_table(arr.size, target_len, out.dtype)
+    # indices are in range by construction; mode="clip" skips take()'s buffered copy of `out`
+    np.take(arr, lo, out=out, mode="clip")
+    step = _scratch_buffer("resample_step", target_len, out.dtype)
+    np.take(arr, hi, out=step, mode="clip")
+    step -= out
+    step *= frac
+    out += step
+    return out
 
 def _infer_seq_len_from_model(model) -> Optional[int]:
     """Return L if model input shape is (None, L) or (None, L, C); else None."""
@@ -60,8 +154,13 @@ def _expects_channel_dim(model) -> bool:
     shp = model.inputs[0].shape
     return len(shp) == 3  # (N, L, 1) or (N, L, C)
 
+def _model_input_buffer(model, L: int, n: int = 1) -> np.ndarray:
+    """Preallocated (n, L) or (n, L, 1) float32 input tensor, reused per worker."""
+    shape = (n, L, 1) if _expects_channel_dim(model) else (n, L)
+    return _scratch_buffer("model_input", shape, np.float32)
+
 def _postprocess_logits_to_prob(y: np.ndarray) -> float:
-    y = np.array(y)
+    y = np.asarray(y)
     if y.ndim == 2 and y.shape[1] == 1:
         prob1 = float(y[0, 0])          # sigmoid
     elif y.ndim == 2 and y.shape[1] == 2:
@@ -71,6 +170,18 @@ def _postprocess_logits_to_prob(y: np.ndarray) -> float:
         prob1 = 1.0 / (1.0 + np.exp(-v))
     return max(0.0, min(1.0, prob1))
 
+def _postprocess_logits_to_probs(y: np.ndarray) -> np.ndarray:
+    """Batch version of _postprocess_logits_to_prob: one probability per row."""
+    y = np.asarray(y, dtype=np.float64)
+    if y.ndim == 2 and y.shape[1] == 1:
+        probs = y[:, 0]                 # sigmoid
+    elif y.ndim == 2 and y.shape[1] == 2:
+        probs = y[:, 1]                 # softmax [p0, p1]
+    else:
+        v = y.reshape(y.shape[0], -1)[:, 0]  # generic score -> sigmoid
+        probs = 1.0 / (1.0 + np.exp(-v))
+    return np.clip(probs, 0.0, 1.0)
+
 def _get_threshold() -> float:
     val = os.getenv("LC_MODEL_THRESHOLD", None)
     if val is None:
@@ -85,14 +196,21 @@ def _get_threshold() -> float:
 # Public API: vector pathway
 # ----------------------------
 
-def preprocess_lightcurve(raw_samples: np.ndarray, target_len: Optional[int] = None) -> np.ndarray:
+def preprocess_lightcurve(raw_samples: np.ndarray, target_len: Optional[int] = None,
+                          out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    NaN-fill, median-detrend, z-score and (optionally) resample to target_len.
+    Pass `out` (1-D, length target_len or len(raw_samples)) to write the result in place;
+    otherwise a new array is returned.
+    """
     x = np.asarray(raw_samples, dtype=np.float32).ravel()
     x = _nan_safe(x)
-    x = _median_detrend(x, None)
-    x = _standardize(x)
-    if target_len is not None:
-        x = _resample_lin(x, target_len)
-    return x
+    if target_len is None:
+        y = _median_detrend(x, None, out=out)
+        return _standardize(y, out=y)
+    y = _median_detrend(x, None, out=_scratch_buffer("detrend", x.size, x.dtype))
+    y = _standardize(y, out=y)
+    return _resample_lin(y, target_len, out=out if out is not None else np.empty(target_len, dtype=y.dtype))
 
 def predict_lightcurve(model, samples: np.ndarray) -> Tuple[float, int]:
     """
@@ -100,11 +218,8 @@ def predict_lightcurve(model, samples: np.ndarray) -> Tuple[float, int]:
     Returns (probability_of_planet, label in {0,1}).
     """
     L = _infer_seq_len_from_model(model) or 512
-    x = preprocess_lightcurve(samples, L)
-
-    x = x[None, ...]  # (1, L)
-    if _expects_channel_dim(model):
-        x = x[..., None]  # (1, L, 1)
+    x = _model_input_buffer(model, L)  # (1, L) or (1, L, 1)
+    preprocess_lightcurve(samples, L, out=x.reshape(-1))
 
     y = model.predict(x, verbose=0)
     prob1 = _postprocess_logits_to_prob(y)
@@ -113,17 +228,41 @@ def predict_lightcurve(model, samples: np.ndarray) -> Tuple[float, int]:
     label = 1 if prob1 >= thr else 0
     return prob1, label
 
+def predict_lightcurve_batch(model, batch: Sequence[np.ndarray],
+                             threshold: Optional[float] = None) -> List[Tuple[float, int]]:
+    """
+    Vector pathway for many curves at once: one model.predict call for the whole batch.
+    Returns [(probability_of_planet, label)] in input order.
+    """
+    if len(batch) == 0:
+        return []
+    L = _infer_seq_len_from_model(model) or 512
+    x = _model_input_buffer(model, L, len(batch))  # (n, L) or (n, L, 1)
+    for i, samples in enumerate(batch):
+        preprocess_lightcurve(samples, L, out=x[i].reshape(-1))
+
+    y = model.predict(x, verbose=0, batch_size=len(batch))
+    probs = _postprocess_logits_to_probs(y)
+
+    thr = _get_threshold() if threshold is None else threshold
+    return [(float(p), 1 if p >= thr else 0) for p in probs]
+
 # ----------------------------
 # Image → series extractor (for plotted light curves)
 # ----------------------------
 
-def _normalize_0_1(arr: np.ndarray) -> np.ndarray:
-    a = arr.astype(np.float32)
+def _normalize_0_1(arr: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    if out is None:
+        a = arr.astype(np.float32)
+    else:
+        a = out
+        np.copyto(a, arr)
     if a.max() > 1.0:
-        a = a / 255.0
+        np.divide(a, 255.0, out=a)
     return a
 
-def _extract_series_from_plot(img: Image.Image, target_len: int) -> np.ndarray:
+def _extract_series_from_plot(img: Image.Image, target_len: int,
+                              out: Optional[np.ndarray] = None) -> np.ndarray:
     """
     Heuristic extractor for typical LC plots:
     1) grayscale
@@ -131,6 +270,7 @@ def _extract_series_from_plot(img: Image.Image, target_len: int) -> np.ndarray:
     3) per-column 'dark-row' soft argmin to trace the curve
     4) invert y to flux-ish and smooth
     5) resample to target_len
+    Pass `out` (length target_len) to write the series in place.
     """
     # 1) grayscale + resize width ~ target_len (keep aspect ratio)
     img = img.convert("L")
@@ -142,35 +282,52 @@ def _extract_series_from_plot(img: Image.Image, target_len: int) -> np.ndarray:
     img = img.resize((new_w, new_h), Image.BILINEAR)
 
     # 2) to numpy, normalize to [0,1]
-    g = _normalize_0_1(np.asarray(img, dtype=np.float32))  # (H,W), 0=black,1=white
+    g = _normalize_0_1(
+        np.asarray(img), out=_scratch_buffer("plot_gray", (new_h, new_w))
+    )  # (H,W), 0=black,1=white
 
-    # optional quick contrast stretch
-    lo, hi = np.percentile(g, [1, 99])
+    # optional quick contrast stretch (percentile partitions a scratch copy in place)
+    flat = _scratch_buffer("plot_pct", g.size)
+    np.copyto(flat, g.ravel())
+    lo, hi = np.percentile(flat, [1, 99], overwrite_input=True)
     if hi > lo:
-        g = np.clip((g - lo) / (hi - lo), 0, 1)
+        np.subtract(g, lo, out=g)
+        np.divide(g, hi - lo, out=g)
+        np.clip(g, 0, 1, out=g)
 
     # 3) soft argmin over rows for each column
     # darker = smaller; use softmin weights
     tau = 0.08  # temperature (tune if needed)
-    W = g.shape[1]
-    rows = np.arange(g.shape[0], dtype=np.float32)[:, None]  # (H,1)
+    H, W = g.shape
+    rows = _row_index(H)  # (H,)
     # weights per column: exp(-(1-g)/tau) => darker (g~0) => larger weight
-    wts = np.exp(-(1.0 - g) / tau)  # (H,W)
-    wts_sum = np.maximum(wts.sum(axis=0, keepdims=True), 1e-6)
-    y_soft = (rows[:, 0:1] * wts).sum(axis=0) / wts_sum[0]  # (W,)
+    wts = _scratch_buffer("plot_wts", (H, W))
+    np.subtract(g, 1.0, out=wts)
+    np.divide(wts, tau, out=wts)
+    np.exp(wts, out=wts)  # (H,W)
+    wts_sum = np.sum(wts, axis=0, out=_scratch_buffer("plot_wsum", W))
+    np.maximum(wts_sum, 1e-6, out=wts_sum)
+    y_norm = np.matmul(rows, wts, out=_scratch_buffer("plot_ysoft", W))  # (W,)
+    y_norm /= wts_sum
     # invert y: top->1, bottom->0
-    y_norm = 1.0 - (y_soft / max(g.shape[0] - 1, 1))
+    y_norm /= -max(H - 1, 1)
+    y_norm += 1.0
 
-    # 4) mild smoothing
+    # 4) mild smoothing (moving average over a padded scratch copy)
     k = max(3, int(W // 200) | 1)
     pad = k // 2
-    y_pad = np.pad(y_norm, (pad, pad), mode="edge")
-    y_sm = np.convolve(y_pad, np.ones(k) / k, mode="valid")
+    y_pad = _scratch_buffer("plot_ypad", W + 2 * pad)
+    y_pad[pad:pad + W] = y_norm
+    y_pad[:pad] = y_norm[0]
+    y_pad[pad + W:] = y_norm[-1]
+    y_sm = np.sum(sliding_window_view(y_pad, k), axis=1, out=_scratch_buffer("plot_ysm", W))
+    y_sm /= k
 
     # 5) resample to target_len and z-score
-    series = _resample_lin(y_sm.astype(np.float32), target_len)
-    series = _standardize(series)
-    return series
+    if out is None:
+        out = np.empty(target_len, dtype=np.float32)
+    series = _resample_lin(y_sm, target_len, out=out)
+    return _standardize(series, out=series)
 
 # ----------------------------
 # Public API: image bytes → model prediction
@@ -189,7 +346,7 @@ def predict_lightcurve_from_image_bytes(model, image_bytes: bytes) -> Tuple[floa
     # CASE A: sequence model (your case) -> extract 1-D series
     L = _infer_seq_len_from_model(model)
     if L is not None:
-        series = _extract_series_from_plot(img, L)
+        series = _extract_series_from_plot(img, L, out=_scratch_buffer("series", L))
         return predict_lightcurve(model, series)
 
     # CASE B: true image model -> build (1,H,W,C)/(1,H,W,1)
@@ -202,13 +359,14 @@ def predict_lightcurve_from_image_bytes(model, image_bytes: bytes) -> Tuple[floa
     if C == 1:
         if img.mode != "L":
             img = img.convert("L")
-        arr = np.asarray(img, dtype=np.float32)[..., None]
+        arr = np.asarray(img)[..., None]
     else:
         if img.mode != "RGB":
             img = img.convert("RGB")
-        arr = np.asarray(img, dtype=np.float32)
+        arr = np.asarray(img)
 
-    x = _normalize_0_1(arr)[None, ...]
+    x = _scratch_buffer("model_input", (1,) + arr.shape, np.float32)
+    _normalize_0_1(arr, out=x[0])
     y = model.predict(x, verbose=0)
     prob1 = _postprocess_logits_to_prob(y)
     thr = _get_threshold()
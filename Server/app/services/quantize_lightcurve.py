@@ -0,0 +1,183 @@
+# app/services/quantize_lightcurve.py
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image  # pillow>=10
+
+from app.services.batch_lightcurve import iter_image_sources
+from app.services.lightcurve_tflite import PRECISIONS
+from app.services.predictor_lightcurve import (
+    _expects_channel_dim,
+    _extract_series_from_plot,
+    _infer_seq_len_from_model,
+    predict_lightcurve,
+    predict_lightcurve_batch,
+    preprocess_lightcurve,
+)
+
+# ----------------------------
+# Offline conversion + parity reporting for reduced-precision light-curve models
+# ----------------------------
+# The serving-side TFLite facade lives in app/services/lightcurve_tflite.py.
+
+# ----------------------------
+# Conversion
+# ----------------------------
+
+def load_sample_curves(src: str, target_len: int, limit: Optional[int] = None) -> List[np.ndarray]:
+    """Trace 1-D series from the plot images under `src` (directory or archive)."""
+    curves: List[np.ndarray] = []
+    for _, path, data in iter_image_sources(src):
+        img = Image.open(path) if data is None else Image.open(io.BytesIO(data))
+        curves.append(_extract_series_from_plot(img, target_len))
+        if limit is not None and len(curves) >= limit:
+            break
+    return curves
+
+
+def representative_dataset(model, curves: Sequence[np.ndarray]) -> Callable[[], Iterator[List[np.ndarray]]]:
+    """
+    Calibration generator for the TFLite converter: each curve goes through
+    preprocess_lightcurve exactly as at serving time, shaped like the model input.
+    """
+    L = _infer_seq_len_from_model(model) or 512
+    shape = (1, L, 1) if _expects_channel_dim(model) else (1, L)
+
+    def gen() -> Iterator[List[np.ndarray]]:
+        for c in curves:
+            yield [preprocess_lightcurve(c, L).astype(np.float32).reshape(shape)]
+
+    return gen
+
+
+def convert_keras_model(keras_model, precision: str,
+                        representative: Optional[Callable[[], Iterator[List[np.ndarray]]]] = None) -> bytes:
+    """Convert an in-memory Keras model to a TFLite flatbuffer at the requested precision."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}; expected one of {PRECISIONS}.")
+    import tensorflow as tf  # lazy import
+
+    conv = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if precision == "float16":
+        conv.optimizations = [tf.lite.Optimize.DEFAULT]
+        conv.target_spec.supported_types = [tf.float16]
+    elif precision == "int8_dynamic":
+        conv.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif precision == "int8":
+        if representative is None:
+            raise ValueError("Full-integer (int8) quantization needs a representative dataset.")
+        conv.optimizations = [tf.lite.Optimize.DEFAULT]
+        conv.representative_dataset = representative
+        conv.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        # keep float32 I/O so callers feed the same preprocessed tensors
+    return conv.convert()
+
+
+# ----------------------------
+# Parity / latency / memory reporting
+# ----------------------------
+
+# below this many held-out curves, parity numbers are reported with a warning
+MIN_PARITY_CURVES = 20
+
+
+def split_calibration_parity(curves: Sequence[np.ndarray], parity_fraction: float,
+                             seed: int = 0) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """
+    Shuffle and split curves into (calibration, held-out parity) sets, so parity is never
+    measured on curves the int8 calibration has seen. Both sets must be non-empty.
+    """
+    if not 0.0 < parity_fraction < 1.0:
+        raise ValueError("parity_fraction must be between 0 and 1 (exclusive).")
+    order = np.random.default_rng(seed).permutation(len(curves))
+    n_parity = int(round(len(curves) * parity_fraction))
+    if n_parity == 0 or n_parity == len(curves):
+        raise ValueError(
+            f"{len(curves)} sample curve(s) can't be split into non-empty calibration and parity sets."
+        )
+    parity = [curves[i] for i in order[:n_parity]]
+    calib = [curves[i] for i in order[n_parity:]]
+    return calib, parity
+
+
+def parity_report(ref_probs: Sequence[float], test_probs: Sequence[float], threshold: float) -> Dict[str, float]:
+    """Probability drift and label agreement of `test_probs` against the float32 reference."""
+    ref = np.asarray(ref_probs, dtype=np.float64)
+    test = np.asarray(test_probs, dtype=np.float64)
+    if ref.shape != test.shape or ref.size == 0:
+        raise ValueError("Parity needs two non-empty probability arrays of the same length.")
+    drift = np.abs(test - ref)
+    return {
+        "n": int(ref.size),
+        "threshold": float(threshold),
+        "max_abs_drift": float(drift.max()),
+        "mean_abs_drift": float(drift.mean()),
+        "p99_abs_drift": float(np.percentile(drift, 99)),
+        "label_agreement": float(np.mean((ref >= threshold) == (test >= threshold))),
+    }
+
+
+def time_predict(model, curves: Sequence[np.ndarray], batch_size: int = 1, repeats: int = 5) -> Dict[str, float]:
+    """Median wall time of predict_lightcurve_batch over `curves`, per call and per curve (ms)."""
+    batches = [list(curves[i:i + batch_size]) for i in range(0, len(curves), batch_size)]
+    predict_lightcurve_batch(model, batches[0], 0.5)  # warm-up (graph tracing / tensor allocation)
+    runs = []
+    for _ in range(max(1, repeats)):
+        t0 = time.perf_counter()
+        for b in batches:
+            predict_lightcurve_batch(model, b, 0.5)
+        runs.append(time.perf_counter() - t0)
+    total_ms = float(np.median(runs)) * 1000.0
+    return {
+        "batch_size": batch_size,
+        "ms_per_call": total_ms / len(batches),
+        "ms_per_curve": total_ms / len(curves),
+    }
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux /proc); None where unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _footprint_worker(kind: str, path: str, num_threads: Optional[int]) -> Dict[str, Optional[int]]:
+    import tensorflow  # noqa: F401  -- same runtime baseline for both kinds; not counted
+    from app.services.lightcurve_tflite import TFLiteLightcurveModel
+    from app.services.model_loader import _load_keras_model
+
+    before = _rss_bytes()
+    if kind == "keras":
+        model = _load_keras_model(path)
+    else:
+        model = TFLiteLightcurveModel.from_file(path, num_threads)
+    L = _infer_seq_len_from_model(model) or 512
+    predict_lightcurve(model, np.random.default_rng(0).standard_normal(L).astype(np.float32))
+    after = _rss_bytes()
+    return {
+        "rss_before_bytes": before,
+        "rss_after_bytes": after,
+        "rss_delta_bytes": None if before is None or after is None else after - before,
+    }
+
+
+def measure_footprint(kind: str, path: str, num_threads: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """
+    RSS growth from loading a model ("keras" or "tflite") and running its first predict,
+    measured in a fresh spawned process after TensorFlow is imported, so both kinds are
+    compared from the same baseline.
+    """
+    if kind not in ("keras", "tflite"):
+        raise ValueError(f"Unknown model kind {kind!r}; expected 'keras' or 'tflite'.")
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        result = pool.submit(_footprint_worker, kind, path, num_threads).result()
+    result["file_bytes"] = os.path.getsize(path)
+    return result
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Offline batch scoring of light-curve plot images (no HTTP server needed).
+
+Usage (from Server/):
+  python scripts/batch_predict_lightcurve.py "../Test Files/Light Curves" -o results.csv
+  python scripts/batch_predict_lightcurve.py plots.zip -o results.parquet --workers 8 --resume
+
+Input is a directory (searched recursively), a .zip, or a tar archive of PNG/JPEG/WEBP plots.
+Output ending in .csv is a CSV file; anything else is a Parquet directory of part files.
+"""
+import argparse
+import os
+import sys
+import time
+
+# One BLAS/OpenMP thread per process: extraction scales across worker processes instead.
+# Must be set before numpy is imported (spawned workers inherit it).
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings  # noqa: E402
+from app.services.batch_lightcurve import image_source_kind, score_images  # noqa: E402
+from app.services.model_loader import _load_keras_model  # noqa: E402
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Score a directory or archive of light-curve plot images.")
+    p.add_argument("src", help="Directory, .zip or .tar[.gz] of plot images")
+    p.add_argument("-o", "--output", required=True, help="results.csv or results.parquet (directory)")
+    p.add_argument("--model", default=settings.LIGHTCURVE_MODEL_PATH, help="Keras model path")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes")
+    p.add_argument("--batch-size", type=int, default=32, help="Curves per model.predict call")
+    p.add_argument("--max-inflight", type=int, default=None,
+                   help="Max images queued for extraction (default: 4 x workers)")
+    p.add_argument("--flush-rows", type=int, default=None,
+                   help="Rows per Parquet part file (default: --batch-size, i.e. one per predict call)")
+    p.add_argument("--threshold", type=float, default=settings.LC_MODEL_THRESHOLD,
+                   help="Label threshold (default: LC_MODEL_THRESHOLD)")
+    p.add_argument("--resume", action="store_true",
+                   help="Skip images already scored in --output (failed ones are retried)")
+    args = p.parse_args(argv)
+
+    try:
+        image_source_kind(args.src)  # fail before loading the model or touching --output
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    print(f"🔍 Loading light-curve model from: {args.model}")
+    model = _load_keras_model(args.model)
+
+    t0 = time.perf_counter()
+    try:
+        counts = score_images(
+            model,
+            args.src,
+            args.output,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            resume=args.resume,
+            threshold=args.threshold,
+            max_inflight=args.max_inflight,
+            flush_rows=args.flush_rows,
+        )
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    dt = time.perf_counter() - t0
+    print(
+        f"✅ Scored {counts['scored']} image(s), {counts['failed']} failed, "
+        f"{counts['skipped']} skipped in {dt:.1f}s -> {args.output}"
+    )
+    return 0 if counts["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
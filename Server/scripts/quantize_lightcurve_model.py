@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Convert the light-curve .keras model to a reduced-precision TFLite model and report parity.
+
+Usage (from Server/):
+  python scripts/quantize_lightcurve_model.py --precision int8
+  python scripts/quantize_lightcurve_model.py --precision float16 --samples plots.zip --report q.json
+
+Curves are traced from the --samples plots and run through preprocess_lightcurve, exactly like
+the serving path. They are split: --parity-fraction is held out for the parity report, the rest
+is used for int8 calibration. Only --calibration-limit curves plus their held-out share are
+traced. Latency is timed on the held-out curves. Memory is the RSS growth from loading each
+model and running its first predict, measured in a fresh process per model. Serve the result
+with LC_MODEL_PRECISION=<precision> (and LC_QUANT_MODEL_PATH if you chose a custom --output).
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings  # noqa: E402
+from app.services.lightcurve_tflite import QUANT_PRECISIONS, TFLiteLightcurveModel, quantized_model_path  # noqa: E402
+from app.services.model_loader import _load_keras_model  # noqa: E402
+from app.services.predictor_lightcurve import _infer_seq_len_from_model, predict_lightcurve_batch  # noqa: E402
+from app.services.quantize_lightcurve import (  # noqa: E402
+    MIN_PARITY_CURVES,
+    convert_keras_model,
+    load_sample_curves,
+    measure_footprint,
+    parity_report,
+    representative_dataset,
+    split_calibration_parity,
+    time_predict,
+)
+
+DEFAULT_SAMPLES = os.path.join(os.path.dirname(__file__), "..", "..", "Test Files", "Light Curves")
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Quantize the light-curve Keras model and compare it to float32.")
+    p.add_argument("--model", default=settings.LIGHTCURVE_MODEL_PATH, help="Source .keras model")
+    p.add_argument("--precision", choices=QUANT_PRECISIONS, default="int8")
+    p.add_argument("--samples", default=DEFAULT_SAMPLES, help="Directory/archive of plot images")
+    p.add_argument("--calibration-limit", type=int, default=500, help="Max curves used for calibration")
+    p.add_argument("--parity-fraction", type=float, default=0.3,
+                   help="Share of sample curves held out of calibration for the parity report")
+    p.add_argument("--seed", type=int, default=0, help="Seed for the calibration/parity split")
+    p.add_argument("--output", default=None, help="Output .tflite (default: <model>.<precision>.tflite)")
+    p.add_argument("--threshold", type=float, default=settings.LC_MODEL_THRESHOLD)
+    p.add_argument("--batch-size", type=int, default=32, help="Batch size for the throughput benchmark")
+    p.add_argument("--report", default=None, help="Also write the report as JSON here")
+    args = p.parse_args(argv)
+
+    out_path = args.output or quantized_model_path(args.model, args.precision)
+
+    print(f"🔍 Loading light-curve model from: {args.model}")
+    keras_model = _load_keras_model(args.model)
+    L = _infer_seq_len_from_model(keras_model)
+    if L is None:
+        print("❌ Only sequence models with input (None, L) or (None, L, C) can be quantized here.", file=sys.stderr)
+        return 2
+
+    # trace only what calibration + its held-out share need, not the whole sample set
+    limit = None
+    if 0.0 < args.parity_fraction < 1.0:  # out-of-range fractions are rejected by the split below
+        limit = math.ceil(max(1, args.calibration_limit) / (1.0 - args.parity_fraction))
+    curves = load_sample_curves(args.samples, L, limit)
+    try:
+        calib, holdout = split_calibration_parity(curves, args.parity_fraction, args.seed)
+    except ValueError as e:
+        print(f"❌ {e} Add more plots under --samples ({args.samples}).", file=sys.stderr)
+        return 2
+    calib = calib[: args.calibration_limit]
+    warning = None
+    if len(holdout) < MIN_PARITY_CURVES:
+        warning = (f"only {len(holdout)} held-out curve(s); parity numbers are not meaningful "
+                   f"below {MIN_PARITY_CURVES}")
+        print(f"⚠️  {warning}", file=sys.stderr)
+
+    print(f"⚙️  Converting to {args.precision} ({len(calib)} calibration curve(s))")
+    tflite_bytes = convert_keras_model(keras_model, args.precision, representative_dataset(keras_model, calib))
+    with open(out_path, "wb") as f:
+        f.write(tflite_bytes)
+    threads = settings.LC_TFLITE_THREADS or None
+    q_model = TFLiteLightcurveModel(tflite_bytes, num_threads=threads)
+
+    ref = [prob for prob, _ in predict_lightcurve_batch(keras_model, holdout, args.threshold)]
+    test = [prob for prob, _ in predict_lightcurve_batch(q_model, holdout, args.threshold)]
+    parity = parity_report(ref, test, args.threshold)
+    parity["calibration_curves"] = len(calib)
+    if warning:
+        parity["warning"] = warning
+
+    mem_f32 = measure_footprint("keras", args.model)
+    mem_q = measure_footprint("tflite", out_path, threads)
+    report = {
+        "precision": args.precision,
+        "output": out_path,
+        "parity": parity,
+        "memory": {
+            "float32": mem_f32,
+            args.precision: mem_q,
+            "rss_delta_ratio": (
+                round(mem_q["rss_delta_bytes"] / mem_f32["rss_delta_bytes"], 4)
+                if mem_q["rss_delta_bytes"] is not None and mem_f32["rss_delta_bytes"] else None
+            ),
+            "file_size_ratio": round(mem_q["file_bytes"] / max(mem_f32["file_bytes"], 1), 4),
+        },
+        "latency": {
+            "float32": [time_predict(keras_model, holdout, 1), time_predict(keras_model, holdout, args.batch_size)],
+            args.precision: [time_predict(q_model, holdout, 1), time_predict(q_model, holdout, args.batch_size)],
+        },
+    }
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(f"✅ Wrote {out_path}; serve it with LC_MODEL_PRECISION={args.precision}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
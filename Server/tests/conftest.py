@@ -0,0 +1,37 @@
+import os
+
+import numpy as np
+import pytest
+
+LC_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "Test Files", "Light Curves")
+
+
+class FakeSeqModel:
+    """Stands in for a Keras sequence model with input shape (None, L, 1)."""
+
+    class _Input:
+        def __init__(self, shape):
+            self.shape = shape
+
+    def __init__(self, L: int = 512, prob: float = 0.75):
+        self.inputs = [self._Input((None, L, 1))]
+        self.prob = prob
+        self.seen = None
+        self.calls = []  # batch size of every predict call
+
+    def predict(self, x, verbose=0, batch_size=None):
+        self.seen = x
+        self.calls.append(x.shape[0])
+        return np.full((x.shape[0], 1), self.prob, dtype=np.float32)
+
+
+@pytest.fixture
+def fake_seq_model():
+    """The FakeSeqModel class; call it (or subclass it) to build a model."""
+    return FakeSeqModel
+
+
+@pytest.fixture
+def lc_dir():
+    """Sample light-curve plot images shipped with the repo."""
+    return LC_DIR
@@ -0,0 +1,148 @@
+import csv
+import os
+import zipfile
+
+import pytest
+
+from app.services import batch_lightcurve as batch
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def plots(tmp_path, lc_dir):
+    """Two good plots plus one undecodable file."""
+    src = tmp_path / "plots"
+    src.mkdir()
+    for k in ("image1.png", "image2.png"):
+        (src / k).write_bytes(open(os.path.join(lc_dir, k), "rb").read())
+    (src / "broken.png").write_bytes(b"not an image")
+    return src
+
+
+def test_iter_image_sources_dir_and_zip(tmp_path, lc_dir):
+    keys = [k for k, _, _ in batch.iter_image_sources(lc_dir)]
+    assert keys == ["image1.png", "image2.png"]
+
+    zpath = tmp_path / "plots.zip"
+    with zipfile.ZipFile(zpath, "w") as zf:
+        for k in keys:
+            zf.write(os.path.join(lc_dir, k), f"curves/{k}")
+        zf.writestr("notes.txt", "ignored")
+    jobs = list(batch.iter_image_sources(str(zpath)))
+    assert [k for k, _, _ in jobs] == ["curves/image1.png", "curves/image2.png"]
+    assert all(path is None and data for _, path, data in jobs)
+
+
+def test_score_images_batches_and_resumes(tmp_path, plots, fake_seq_model):
+    out = str(tmp_path / "results.csv")
+
+    model = fake_seq_model(256)
+    counts = batch.score_images(model, str(plots), out, workers=2, batch_size=8, threshold=0.5)
+    assert counts == {"scored": 2, "failed": 1, "skipped": 0}
+    assert model.calls == [2]  # both curves went through a single predict call
+    rows = {r["path"]: r for r in _read_csv(out)}
+    assert rows["image1.png"]["label"] == "1" and rows["broken.png"]["error"]
+
+    (plots / "sub").mkdir()
+    (plots / "sub" / "image3.png").write_bytes((plots / "image1.png").read_bytes())
+    counts = batch.score_images(fake_seq_model(256), str(plots), out, workers=2, batch_size=8, resume=True)
+    # broken.png still fails and is retried; the two scored images are skipped
+    assert counts == {"scored": 1, "failed": 1, "skipped": 2}
+    assert [r["path"] for r in _read_csv(out)][-2:] == ["broken.png", "sub/image3.png"]
+
+
+def test_resume_retries_failed_then_fixed_image(tmp_path, plots, fake_seq_model):
+    out = str(tmp_path / "results.csv")
+    batch.score_images(fake_seq_model(256), str(plots), out, workers=1)
+
+    (plots / "broken.png").write_bytes((plots / "image2.png").read_bytes())  # fixed in place
+    counts = batch.score_images(fake_seq_model(256), str(plots), out, workers=1, resume=True)
+    assert counts == {"scored": 1, "failed": 0, "skipped": 2}
+    last = [r for r in _read_csv(out) if r["path"] == "broken.png"][-1]
+    assert last["label"] == "1" and not last["error"]
+
+
+@pytest.mark.parametrize("content", ["", "image1.png,0.5,1,\n"])
+def test_resume_rewrites_empty_or_headerless_csv(tmp_path, plots, fake_seq_model, content):
+    out = tmp_path / "results.csv"
+    out.write_text(content, encoding="utf-8")
+    counts = batch.score_images(fake_seq_model(256), str(plots), str(out), workers=1, resume=True)
+    assert counts == {"scored": 2, "failed": 1, "skipped": 0}
+    assert sorted(r["path"] for r in _read_csv(out)) == ["broken.png", "image1.png", "image2.png"]
+
+
+def test_csv_header_is_flushed_before_first_batch(tmp_path):
+    out = str(tmp_path / "results.csv")
+    sink = batch.open_sink(out, resume=False)
+    try:
+        assert _read_csv(out) == [] and open(out, encoding="utf-8").read().startswith("path,")
+    finally:
+        sink.close()
+
+
+def test_parquet_round_trip_and_resume(tmp_path, plots, fake_seq_model):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    out = str(tmp_path / "results.parquet")
+
+    counts = batch.score_images(fake_seq_model(256), str(plots), out, workers=1)
+    assert counts == {"scored": 2, "failed": 1, "skipped": 0}
+    df = pd.read_parquet(out)
+    assert sorted(df["path"]) == ["broken.png", "image1.png", "image2.png"]
+    assert df.loc[df["path"] == "image1.png", "label"].item() == 1
+    assert df.loc[df["path"] == "broken.png", "error"].notna().item()
+
+    (plots / "broken.png").write_bytes((plots / "image2.png").read_bytes())
+    counts = batch.score_images(fake_seq_model(256), str(plots), out, workers=1, resume=True)
+    assert counts == {"scored": 1, "failed": 0, "skipped": 2}
+    assert sorted(os.listdir(out)) == ["part-00000.parquet", "part-00001.parquet"]
+
+    counts = batch.score_images(fake_seq_model(256), str(plots), out, workers=1, resume=False)
+    assert counts["skipped"] == 0 and sorted(os.listdir(out)) == ["part-00000.parquet"]
+
+
+def test_parquet_without_engine_fails_clearly(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch.importlib.util, "find_spec", lambda name: None)
+    with pytest.raises(RuntimeError, match="pip install pyarrow"):
+        batch.open_sink(str(tmp_path / "results.parquet"), resume=False)
+
+
+@pytest.mark.parametrize("name", ["results.csv", "results.parquet"])
+def test_bad_source_leaves_existing_output_intact(tmp_path, plots, fake_seq_model, name):
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    out = str(tmp_path / name)
+    batch.score_images(fake_seq_model(256), str(plots), out, workers=1)
+    before = open(out, "rb").read() if name.endswith(".csv") else sorted(os.listdir(out))
+
+    bogus = tmp_path / "plots.txt"
+    bogus.write_text("not an archive", encoding="utf-8")
+    for src in (str(bogus), str(tmp_path / "missing")):
+        with pytest.raises(ValueError):
+            batch.score_images(fake_seq_model(256), src, out, workers=1)
+    after = open(out, "rb").read() if name.endswith(".csv") else sorted(os.listdir(out))
+    assert after == before
+
+
+def test_parquet_parts_flush_per_batch_and_skip_numbering_gaps(tmp_path, plots, fake_seq_model):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    out = tmp_path / "results.parquet"
+
+    sink = batch.open_sink(str(out), resume=False, flush_rows=2)
+    try:
+        sink.write([{"path": "a.png", "probability": 0.9, "label": 1, "error": None}] * 2)
+        assert os.listdir(out) == ["part-00000.parquet"]  # on disk before close
+    finally:
+        sink.close()
+
+    # a gap in the numbering (part-00001 removed) must not lead to part-00002 being overwritten
+    os.rename(out / "part-00000.parquet", out / "part-00002.parquet")
+    counts = batch.score_images(fake_seq_model(256), str(plots), str(out), workers=1, batch_size=1, resume=True)
+    assert counts == {"scored": 2, "failed": 1, "skipped": 0}
+    assert sorted(os.listdir(out)) == [f"part-{i:05d}.parquet" for i in (2, 3, 4, 5)]
+    assert len(pd.read_parquet(out)) == 5
@@ -0,0 +1,159 @@
+import gc
+import io
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+from PIL import Image
+
+from app.services import predictor_lightcurve as lc
+
+
+def _curve(n: int = 3000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    x = 1.0 + 0.001 * rng.standard_normal(n)
+    x[1400:1450] -= 0.01  # transit-like dip
+    return x.astype(np.float32)
+
+
+def _plot_png(w: int = 640, h: int = 300) -> bytes:
+    g = np.full((h, w), 255, dtype=np.uint8)
+    cols = np.arange(w)
+    rows = (h / 2 + 40 * np.sin(cols / 40.0)).astype(int)
+    g[rows, cols] = 0
+    buf = io.BytesIO()
+    Image.fromarray(g).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _reference_preprocess(raw, target_len):
+    """The original allocate-per-call implementation, kept for parity checks."""
+    x = np.asarray(raw, dtype=np.float32).ravel()
+    win = int(max(11, min(101, x.size // 30))) // 2 * 2 + 1
+    pad = win // 2
+    xp = np.pad(x, (pad, pad), mode="edge")
+    base = np.array([np.median(xp[i:i + win]) for i in range(x.size)], dtype=np.float32)
+    x = x - base
+    x = (x - np.mean(x)) / (np.std(x) + 1e-8)
+    return np.interp(np.linspace(0, 1, target_len), np.linspace(0, 1, x.size), x)
+
+
+def _big_blocks(snapshot, min_size: int = 1024) -> Counter:
+    return Counter(tr.size for tr in snapshot.traces if tr.size >= min_size)
+
+
+def _steady_state_alloc(fn, n_calls: int = 20):
+    """Return (peak bytes allocated during one call, array-sized blocks retained per call).
+
+    Small interpreter-level caches (free lists, interned names) settle at a bounded size,
+    so only blocks of >= 1 KB, i.e. actual array buffers, count as retained.
+    """
+    fn()  # warm up scratch buffers and lookup tables
+    tracemalloc.start()
+    try:
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        peak_delta = 0
+        for _ in range(n_calls):
+            gc.collect()  # drop cyclic garbage from earlier calls so it isn't counted twice
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_delta = max(peak_delta, peak - base)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum((_big_blocks(after) - _big_blocks(before)).values())
+    return peak_delta, retained / n_calls
+
+
+def test_preprocess_matches_reference():
+    raw = _curve()
+    for L in (512, 1000, 3000):
+        np.testing.assert_allclose(lc.preprocess_lightcurve(raw, L), _reference_preprocess(raw, L),
+                                   rtol=1e-4, atol=1e-4)
+
+
+def test_preprocess_out_is_written_in_place():
+    out = np.empty(512, dtype=np.float32)
+    res = lc.preprocess_lightcurve(_curve(), 512, out=out)
+    assert res is out
+    # default call still hands back a fresh array
+    assert lc.preprocess_lightcurve(_curve(), 512) is not lc.preprocess_lightcurve(_curve(), 512)
+
+
+def test_resample_table_is_cached_and_matches_interp():
+    a = np.random.default_rng(1).standard_normal(777)
+    f32 = np.dtype(np.float32)
+    assert lc._resample_table(777, 512, f32) is lc._resample_table(777, 512, f32)
+    np.testing.assert_allclose(lc._resample_lin(a, 512),
+                               np.interp(np.linspace(0, 1, 512), np.linspace(0, 1, 777), a))
+
+
+def test_predict_lightcurve_steady_state_allocations(fake_seq_model):
+    model = fake_seq_model(512)
+    raw = _curve()
+    prob, label = lc.predict_lightcurve(model, raw)
+    assert model.seen.shape == (1, 512, 1) and model.seen.dtype == np.float32
+    assert (prob, label) == (0.75, 1)
+
+    peak, retained = _steady_state_alloc(lambda: lc.predict_lightcurve(model, raw))
+    # a single fresh (3000,) float32 copy would be 12 KB; stay well under that
+    assert peak < 8192, peak
+    assert retained == 0, retained
+
+    # NaN-bearing curves take the interp path but must keep the pooled buffers' dtype,
+    # so mixed clean/NaN traffic reuses the same scratch memory
+    gappy = raw.copy()
+    gappy[::97] = np.nan
+    pool = lc._scratch.pool
+    before = {name: pool[name] for name in ("rm_pad", "baseline", "detrend")}
+
+    def mixed():
+        lc.predict_lightcurve(model, gappy)
+        lc.predict_lightcurve(model, raw)
+
+    peak, retained = _steady_state_alloc(mixed)
+    assert all(pool[name] is buf for name, buf in before.items())
+    # only the interp fill itself allocates: a few (3000,) temporaries on the NaN call
+    assert peak < 8 * raw.size * 8, peak
+    assert retained == 0, retained
+
+
+def test_image_prediction_steady_state_allocations(fake_seq_model):
+    model = fake_seq_model(512)
+    png = _plot_png()
+    lc.predict_lightcurve_from_image_bytes(model, png)
+
+    peak, retained = _steady_state_alloc(lambda: lc.predict_lightcurve_from_image_bytes(model, png))
+    # the plot is resized to 512x240; only PIL's uint8 pixel hand-off (tobytes + join,
+    # ~2*H*W bytes) is allocated per request, the float32 (H, W) planes are reused scratch
+    h, w = 240, 512
+    assert peak < 2 * h * w + 16384, peak
+    assert retained == 0, retained
+
+
+def test_predict_lightcurve_batch_matches_single(fake_seq_model):
+    class _RowModel(fake_seq_model):
+        def predict(self, x, verbose=0, batch_size=None):
+            return 1.0 / (1.0 + np.exp(-x[:, :8, 0].mean(axis=1, keepdims=True)))
+
+    model = _RowModel(512)
+    curves = [_curve(seed=s) for s in range(3)]
+    batch = lc.predict_lightcurve_batch(model, curves, threshold=0.5)
+    assert batch == [lc.predict_lightcurve(model, c) for c in curves]
+    assert lc.predict_lightcurve_batch(model, []) == []
+
+
+def test_oversized_plot_planes_are_not_pooled(monkeypatch, fake_seq_model):
+    monkeypatch.setattr(lc, "_SCRATCH_MAX_BYTES", 1 << 20)
+    monkeypatch.setattr(lc._scratch, "pool", {}, raising=False)  # this thread's pool, fresh
+    model = fake_seq_model(512)
+    # 100x1000 plot -> resized to 512x5120: each float32 (H, W) plane is ~10 MiB
+    lc.predict_lightcurve_from_image_bytes(model, _plot_png(w=100, h=1000))
+    pooled = {name: buf.nbytes for name, buf in lc._scratch.pool.items()}
+    assert max(pooled.values()) <= 1 << 20, pooled
+    for name in ("plot_gray", "plot_pct", "plot_wts"):
+        assert pooled.get(name, 0) <= 1 << 20, name
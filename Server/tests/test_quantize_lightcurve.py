@@ -0,0 +1,103 @@
+import dataclasses
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from app.services import model_loader
+from app.services import lightcurve_tflite as rt
+from app.services import quantize_lightcurve as q
+from app.services.predictor_lightcurve import predict_lightcurve_batch, preprocess_lightcurve
+
+
+def test_quantized_model_path():
+    assert rt.quantized_model_path("models/lightcurve/model.keras", "int8") == "models/lightcurve/model.int8.tflite"
+
+
+def test_representative_dataset_uses_serving_preprocessing(fake_seq_model, lc_dir):
+    model = fake_seq_model(128)
+    curves = q.load_sample_curves(lc_dir, 128)
+    assert len(curves) == 2
+    samples = [s for (s,) in q.representative_dataset(model, curves)()]
+    assert all(s.shape == (1, 128, 1) and s.dtype == np.float32 for s in samples)
+    np.testing.assert_allclose(samples[0].ravel(), preprocess_lightcurve(curves[0], 128), rtol=1e-6)
+
+
+def test_parity_report():
+    rep = q.parity_report([0.1, 0.6, 0.49, 0.9], [0.12, 0.58, 0.51, 0.9], threshold=0.5)
+    assert rep["n"] == 4
+    assert rep["label_agreement"] == 0.75  # 0.49 -> 0.51 flips across the threshold
+    assert rep["max_abs_drift"] == pytest.approx(0.02)
+    with pytest.raises(ValueError):
+        q.parity_report([0.1], [0.1, 0.2], 0.5)
+
+
+def test_split_calibration_parity_holds_out_curves():
+    curves = [np.full(8, i, dtype=np.float32) for i in range(10)]
+    calib, parity = q.split_calibration_parity(curves, 0.3, seed=1)
+    assert (len(calib), len(parity)) == (7, 3)
+    seen = {float(c[0]) for c in calib}
+    assert seen.isdisjoint(float(c[0]) for c in parity)
+    assert seen | {float(c[0]) for c in parity} == set(range(10))
+    with pytest.raises(ValueError):
+        q.split_calibration_parity(curves[:1], 0.3)  # nothing left to hold out
+    with pytest.raises(ValueError):
+        q.split_calibration_parity(curves, 1.0)
+
+
+def test_serving_runtime_does_not_import_offline_tooling():
+    code = (
+        "import sys; import app.services.model_loader, app.services.lightcurve_tflite; "
+        "bad = [m for m in ('app.services.batch_lightcurve', 'app.services.quantize_lightcurve') "
+        "if m in sys.modules]; assert not bad, bad"
+    )
+    server_dir = os.path.join(os.path.dirname(__file__), "..")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=server_dir)
+
+
+def test_unknown_precision_is_rejected(monkeypatch):
+    model_loader._clear_model_caches_for_tests()
+    monkeypatch.setattr(model_loader, "settings",
+                        dataclasses.replace(model_loader.settings, LC_MODEL_PRECISION="int4"))
+    with pytest.raises(RuntimeError, match="LC_MODEL_PRECISION"):
+        model_loader.get_lightcurve_model()
+
+
+@pytest.mark.parametrize("precision", ["float16", "int8_dynamic", "int8"])
+def test_tflite_model_tracks_keras(precision):
+    tf = pytest.importorskip("tensorflow")
+    L = 64
+    keras_model = tf.keras.Sequential([
+        tf.keras.Input(shape=(L, 1)),
+        tf.keras.layers.Conv1D(4, 5, activation="relu"),
+        tf.keras.layers.GlobalAveragePooling1D(),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    rng = np.random.default_rng(0)
+    curves = [rng.standard_normal(300).astype(np.float32) for _ in range(16)]
+
+    content = q.convert_keras_model(keras_model, precision, q.representative_dataset(keras_model, curves))
+    tfl = rt.TFLiteLightcurveModel(content)
+    assert tfl.inputs[0].shape == (None, L, 1)
+
+    ref = [p for p, _ in predict_lightcurve_batch(keras_model, curves, 0.5)]
+    test = [p for p, _ in predict_lightcurve_batch(tfl, curves, 0.5)]
+    assert q.parity_report(ref, test, 0.5)["max_abs_drift"] < 0.05
+
+
+def test_measure_footprint_reports_rss_growth(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    keras_model = tf.keras.Sequential([
+        tf.keras.Input(shape=(64, 1)),
+        tf.keras.layers.Conv1D(4, 5, activation="relu"),
+        tf.keras.layers.GlobalAveragePooling1D(),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+    path = tmp_path / "model.int8_dynamic.tflite"
+    path.write_bytes(q.convert_keras_model(keras_model, "int8_dynamic"))
+    mem = q.measure_footprint("tflite", str(path))
+    assert mem["file_bytes"] == path.stat().st_size
+    if mem["rss_delta_bytes"] is not None:  # Linux only
+        assert mem["rss_after_bytes"] >= mem["rss_before_bytes"] > 0